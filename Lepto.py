@@ -12,6 +12,7 @@ from scipy.stats import pearsonr
 import calendar
 from datetime import datetime
 import joblib  # For saving the trained model
+from Model.features import TARGET, build_features
 
 # Regional threshold definitions for European regions
 REGIONAL_THRESHOLDS = {
@@ -69,9 +70,8 @@ def load_and_prepare_data(file_path):
     """Load and prepare the dataset"""
     try:
         data = pd.read_csv(file_path)
-        features = ['Temperature_Celsius', 'Dew_Point_Celsius', 'Relative_Humidity', 'TP']
-        target = 'Leptospirosis_Rate'
-        data = data.dropna()
+        data, features = build_features(data.dropna())
+        target = TARGET
         # Add month column if not present (assuming you have a date column)
         if 'Month' not in data.columns and 'Date' in data.columns:
             data['Month'] = pd.to_datetime(data['Date']).dt.month
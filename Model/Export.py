@@ -0,0 +1,179 @@
+import argparse
+import csv
+import io
+import os
+import sqlite3
+import time
+import pandas as pd
+from Model import MODEL_DIR
+
+# Prediction CSV column -> riskanalysis column, as read by backend/index.js
+COLUMNS = {
+    'Year': 'year',
+    'Country': 'country',
+    'Prediction': 'predicted_rate',
+    'Risk Percentage': 'risk_percentage',
+    'Risk Level': 'risk_level',
+    'Primary Factor': 'primary_factor',
+    'Recommendation': 'recommendations'
+}
+KEY_COLUMNS = ['year', 'country']
+BATCH_SIZE = 10000
+
+CREATE_TABLE = """
+CREATE TABLE IF NOT EXISTS riskanalysis (
+    year integer NOT NULL,
+    country varchar(100) NOT NULL,
+    predicted_rate numeric(10,2),
+    risk_percentage numeric(5,2),
+    risk_level varchar(50),
+    primary_factor varchar(100),
+    recommendations text
+)
+"""
+# The unique index backs the upsert and the backend's ORDER BY Year, Country;
+# the second one serves the per-country lookups ordered by year.
+CREATE_INDEXES = [
+    "CREATE UNIQUE INDEX IF NOT EXISTS riskanalysis_year_country_idx ON riskanalysis (year, country)",
+    "CREATE INDEX IF NOT EXISTS riskanalysis_country_year_idx ON riskanalysis (country, year)"
+]
+
+def load_predictions(file_path):
+    try:
+        data = pd.read_csv(file_path)
+    except FileNotFoundError:
+        print(f"Error: File '{file_path}' not found.")
+        return None
+    missing = [column for column in COLUMNS if column not in data.columns]
+    if missing:
+        print(f"Error: File '{file_path}' is missing columns {missing}.")
+        return None
+    data = data[list(COLUMNS)].rename(columns=COLUMNS)
+    # Keep the last prediction for each key so a batch never conflicts with itself
+    return data.drop_duplicates(subset=KEY_COLUMNS, keep='last')
+
+def find_duplicate_keys(conn, limit=5):
+    keys = ", ".join(KEY_COLUMNS)
+    cur = conn.cursor()
+    cur.execute(
+        f"SELECT {keys}, COUNT(*) FROM riskanalysis GROUP BY {keys} "
+        f"HAVING COUNT(*) > 1 ORDER BY {keys} LIMIT {int(limit)}"
+    )
+    return cur.fetchall()
+
+def ensure_schema(conn):
+    cur = conn.cursor()
+    cur.execute(CREATE_TABLE)
+    # Tables restored from Database/backup_new.sql have no key, so existing
+    # duplicates would make the unique index (and the upsert) fail
+    duplicates = find_duplicate_keys(conn)
+    if duplicates:
+        conn.rollback()
+        print(
+            "Error: riskanalysis already has several rows for the same (year, country), "
+            f"e.g. {[tuple(row[:2]) for row in duplicates]}. "
+            "Remove the duplicates before exporting."
+        )
+        return False
+    for statement in CREATE_INDEXES:
+        cur.execute(statement)
+    conn.commit()
+    return True
+
+def upsert_sql(source):
+    columns = list(COLUMNS.values())
+    updates = ", ".join(f"{c} = excluded.{c}" for c in columns if c not in KEY_COLUMNS)
+    return (
+        f"INSERT INTO riskanalysis ({', '.join(columns)}) {source} "
+        f"ON CONFLICT ({', '.join(KEY_COLUMNS)}) DO UPDATE SET {updates}"
+    )
+
+def iter_batches(data, batch_size):
+    for start in range(0, len(data), batch_size):
+        yield data.iloc[start:start + batch_size]
+
+def connect_sqlite(path):
+    return sqlite3.connect(path)
+
+def connect_postgres(database_url=None):
+    try:
+        import psycopg2
+    except ImportError:
+        print("Error: psycopg2 is required for PostgreSQL export (pip install psycopg2-binary).")
+        return None
+    database_url = database_url or os.environ.get('DATABASE_URL')
+    if database_url:
+        return psycopg2.connect(database_url)
+    # Same defaults as backend/index.js
+    return psycopg2.connect(
+        user=os.environ.get('PG_USER', 'postgres'),
+        host=os.environ.get('PG_HOST', 'localhost'),
+        dbname=os.environ.get('PG_DATABASE', 'lepto_db'),
+        password=os.environ.get('PG_PASSWORD', '1234'),
+        port=os.environ.get('PG_PORT', 5432)
+    )
+
+def export_sqlite(conn, data, batch_size=BATCH_SIZE):
+    placeholders = ", ".join("?" for _ in COLUMNS)
+    sql = upsert_sql(f"VALUES ({placeholders})")
+    cur = conn.cursor()
+    for batch in iter_batches(data, batch_size):
+        cur.executemany(sql, batch.itertuples(index=False, name=None))
+    conn.commit()
+
+def export_postgres(conn, data, batch_size=BATCH_SIZE):
+    columns = ", ".join(COLUMNS.values())
+    cur = conn.cursor()
+    cur.execute(
+        "CREATE TEMP TABLE riskanalysis_staging "
+        "(LIKE riskanalysis INCLUDING DEFAULTS) ON COMMIT DROP"
+    )
+    # COPY each batch into the staging table, then upsert everything in one statement
+    for batch in iter_batches(data, batch_size):
+        buffer = io.StringIO()
+        batch.to_csv(buffer, index=False, header=False, quoting=csv.QUOTE_MINIMAL)
+        buffer.seek(0)
+        cur.copy_expert(f"COPY riskanalysis_staging ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+    cur.execute(upsert_sql(f"SELECT {columns} FROM riskanalysis_staging"))
+    conn.commit()
+
+def export_predictions(conn, data, backend, batch_size=BATCH_SIZE):
+    if not ensure_schema(conn):
+        return None
+    start = time.perf_counter()
+    if backend == 'postgres':
+        export_postgres(conn, data, batch_size)
+    else:
+        export_sqlite(conn, data, batch_size)
+    elapsed = time.perf_counter() - start
+    per_10k = elapsed / max(len(data), 1) * 10000
+    print(f"Exported {len(data)} rows to {backend} in {elapsed:.3f}s ({per_10k:.3f}s per 10k rows)")
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Export predictions to the riskanalysis table.")
+    parser.add_argument('file_path', nargs='?', default=os.path.join(MODEL_DIR, 'leptospirosis_predictions.csv'))
+    parser.add_argument('--sqlite', metavar='PATH', help="write to a local SQLite database instead of PostgreSQL")
+    parser.add_argument('--database-url', help="PostgreSQL URL (defaults to DATABASE_URL or the PG_* variables)")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    data = load_predictions(args.file_path)
+    if data is None:
+        print("Failed to load predictions.")
+        return
+
+    if args.sqlite:
+        backend, conn = 'sqlite', connect_sqlite(args.sqlite)
+    else:
+        backend, conn = 'postgres', connect_postgres(args.database_url)
+        if conn is None:
+            return
+
+    try:
+        export_predictions(conn, data, backend, args.batch_size)
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,33 @@
+import argparse
+import copy
+import hashlib
+import os
+import shutil
+import sys
+import time
+import numpy as np
 import pandas as pd
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 import joblib
+from Model import MODEL_DIR
+from Model.features import (
+    FEATURES, GROUP_COLUMN, ORDER_COLUMN, TARGET,
+    add_derived_features, add_history_features, build_features, feature_columns
+)
+from Model.registry import publish_model, update_data_hash
+
+# Per-country history features; recorded in the registry so Predict.py rebuilds the same columns
+LAGS = ()
+WINDOWS = ()
+
+# Streaming mode: each chunk adds TREES_PER_CHUNK trees to a warm-started forest
+CHUNKSIZE = 100000
+TREES_PER_CHUNK = 10
+CHECKPOINT_DIR = os.path.join(MODEL_DIR, 'training_checkpoint')
+CHECKPOINT_STATE = 'state.pkl'
+CHECKPOINT_FOREST = 'forest.pkl'
+MODEL_FILE = os.path.join(MODEL_DIR, 'trained_model.pkl')
 
 def load_data(file_path):
     try:
@@ -16,22 +42,245 @@ def train_and_save_model(data, features, target):
     y = data[target]
     model = RandomForestRegressor(n_estimators=100, random_state=42)
     model.fit(X, y)
-    joblib.dump(model, 'trained_model.pkl')
+    joblib.dump(model, MODEL_FILE)
     return model, X, y
 
 def evaluate_model(model, X, y):
     y_pred = model.predict(X)
-    print(f"MAE: {mean_absolute_error(y, y_pred)}")
-    print(f"MSE: {mean_squared_error(y, y_pred)}")
-    print(f"R2: {r2_score(y, y_pred)}")
+    metrics = {
+        'mae': mean_absolute_error(y, y_pred),
+        'mse': mean_squared_error(y, y_pred),
+        'r2': r2_score(y, y_pred)
+    }
+    print(f"MAE: {metrics['mae']}")
+    print(f"MSE: {metrics['mse']}")
+    print(f"R2: {metrics['r2']}")
+    return metrics
+
+def iter_chunks(file_path, chunksize):
+    if file_path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(file_path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(file_path, chunksize=chunksize)
+
+def history_length(lags, windows):
+    # Rows per country that must carry over so lags and windows span chunk boundaries
+    return max(list(lags) + [window - 1 for window in windows], default=0)
+
+def hash_training_rows(hasher, data):
+    # Rows are hashed in file order before history features reorder them, so
+    # streamed and in-memory runs over the same file record the same digest
+    rows = data[FEATURES + [TARGET]].astype({TARGET: np.float64})
+    return update_data_hash(hasher, rows)
+
+def prepare_chunk(chunk, history, lags, windows, hasher=None):
+    # Same steps as build_features, split so the rows can be hashed in between
+    chunk = add_derived_features(chunk.dropna())
+    if hasher is not None:
+        hash_training_rows(hasher, chunk)
+    features = feature_columns(lags, windows)
+    carry = history_length(lags, windows)
+    if carry == 0:
+        return add_history_features(chunk, lags, windows), features, None
+
+    pieces = [chunk.assign(_carried=False)]
+    if history is not None:
+        pieces.insert(0, history.assign(_carried=True))
+    data = add_history_features(pd.concat(pieces, ignore_index=True), lags, windows)
+    history = data.drop(columns='_carried').sort_values([GROUP_COLUMN, ORDER_COLUMN])
+    history = history.groupby(GROUP_COLUMN).tail(carry)
+    data = data[~data['_carried']].drop(columns='_carried')
+    return data.dropna(subset=features), features, history
+
+def peak_memory_mib():
+    # Peak RSS of the process; unlike tracemalloc this includes native
+    # allocations such as scikit-learn's tree node arrays
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+        except ImportError:
+            return None
+        info = psutil.Process().memory_info()
+        return getattr(info, 'peak_wset', info.rss) / 1024 ** 2
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+def _dump_atomic(obj, path):
+    tmp_path = path + '.tmp'
+    joblib.dump(obj, tmp_path)
+    os.replace(tmp_path, path)
+
+def load_checkpoint(checkpoint_dir):
+    state_path = os.path.join(checkpoint_dir, CHECKPOINT_STATE)
+    if not os.path.exists(state_path):
+        return None, None
+    state = joblib.load(state_path)
+    model = joblib.load(os.path.join(checkpoint_dir, CHECKPOINT_FOREST))
+    for name in state['tree_files']:
+        model.estimators_.extend(joblib.load(os.path.join(checkpoint_dir, name)))
+    model.set_params(n_estimators=len(model.estimators_))
+    return state, model
+
+def save_checkpoint(checkpoint_dir, state, model, trees_per_chunk):
+    # The forest without its trees is written once; afterwards each chunk only
+    # writes the trees it added, so checkpoint I/O stays linear in the data size.
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    forest_path = os.path.join(checkpoint_dir, CHECKPOINT_FOREST)
+    if not os.path.exists(forest_path):
+        skeleton = copy.copy(model)
+        skeleton.estimators_ = []
+        _dump_atomic(skeleton, forest_path)
+    name = f"trees_{state['chunks_done']:06d}.pkl"
+    _dump_atomic(model.estimators_[-trees_per_chunk:], os.path.join(checkpoint_dir, name))
+    state['tree_files'].append(name)
+    _dump_atomic(state, os.path.join(checkpoint_dir, CHECKPOINT_STATE))
+
+def train_streaming(file_path, lags=LAGS, windows=WINDOWS, chunksize=CHUNKSIZE,
+                    trees_per_chunk=TREES_PER_CHUNK, checkpoint_dir=CHECKPOINT_DIR):
+    # A checkpoint is only valid for the exact run that wrote it
+    config = {
+        'file_path': os.path.abspath(file_path),
+        'chunksize': chunksize,
+        'trees_per_chunk': trees_per_chunk,
+        'lags': list(lags),
+        'windows': list(windows)
+    }
+    state, model = load_checkpoint(checkpoint_dir)
+    if state is not None:
+        changed = sorted(key for key in config if state['config'].get(key) != config[key])
+        if changed:
+            print(f"Error: checkpoint in '{checkpoint_dir}' was written with different {changed}. "
+                  "Rerun with the original settings or delete the checkpoint to start over.")
+            return None, None
+        print(f"Resuming from checkpoint after {state['chunks_done']} chunks ({state['rows']} rows).")
+    else:
+        shutil.rmtree(checkpoint_dir, ignore_errors=True)
+        model = RandomForestRegressor(n_estimators=0, warm_start=True, random_state=42)
+        state = {
+            'config': config,
+            'chunks_done': 0,
+            'rows': 0,
+            'tree_files': [],
+            # Progressive validation: each chunk is scored before the forest trains on it
+            'abs_error': 0.0,
+            'sq_error': 0.0,
+            'scored_rows': 0
+        }
+
+    hasher = hashlib.sha256()
+    history = None
+    features = None
+    start = time.perf_counter()
+    new_rows = 0
+
+    try:
+        for i, chunk in enumerate(iter_chunks(file_path, chunksize)):
+            chunk_start = time.perf_counter()
+            data, features, history = prepare_chunk(chunk, history, lags, windows, hasher)
+            # Chunks from before a restart are re-read only to rebuild the hash and history
+            if i < state['chunks_done'] or data.empty:
+                continue
+
+            X = data[features].to_numpy(dtype=np.float32)
+            y = data[TARGET].to_numpy()
+            if model.n_estimators > 0:
+                error = model.predict(X) - y
+                state['abs_error'] += float(np.abs(error).sum())
+                state['sq_error'] += float(np.square(error).sum())
+                state['scored_rows'] += len(y)
+
+            model.set_params(n_estimators=model.n_estimators + trees_per_chunk)
+            model.fit(X, y)
+            state['chunks_done'] = i + 1
+            state['rows'] += len(y)
+            new_rows += len(y)
+            save_checkpoint(checkpoint_dir, state, model, trees_per_chunk)
+
+            elapsed = time.perf_counter() - chunk_start
+            print(f"Chunk {i + 1}: {len(y)} rows | {len(y) / elapsed:,.0f} rows/sec | {model.n_estimators} trees")
+    except FileNotFoundError:
+        print(f"Error: File '{file_path}' not found.")
+        return None, None
+
+    elapsed = time.perf_counter() - start
+    print(f"Trained on {new_rows} rows in {elapsed:.1f}s ({new_rows / max(elapsed, 1e-9):,.0f} rows/sec)")
+    peak = peak_memory_mib()
+    if peak is not None:
+        print(f"Peak memory (RSS): {peak:.1f} MiB")
+
+    if features is None or model.n_estimators == 0:
+        print("No training data found.")
+        return None, None
+
+    scored = state['scored_rows']
+    if scored:
+        metrics = {
+            'progressive_mae': state['abs_error'] / scored,
+            'progressive_mse': state['sq_error'] / scored,
+            'scored_rows': scored
+        }
+        print(f"Progressive MAE: {metrics['progressive_mae']}")
+        print(f"Progressive MSE: {metrics['progressive_mse']}")
+    else:
+        # The first chunk is never scored, so a single-chunk run has no holdout
+        metrics = {'progressive_mae': None, 'progressive_mse': None, 'scored_rows': 0}
+        print("Warning: the data fit in one chunk, so no rows were scored and no metrics are available. "
+              "Use a smaller --chunksize to get progressive validation.")
+
+    joblib.dump(model, MODEL_FILE)
+    version = publish_model(
+        model, features, TARGET, None, metrics,
+        extra={
+            'lags': list(lags),
+            'windows': list(windows),
+            'training_rows': state['rows'],
+            'training_data_hash': hasher.hexdigest(),
+            'training_mode': 'streaming'
+        }
+    )
+    print(f"Published model version {version} to the registry.")
+    shutil.rmtree(checkpoint_dir, ignore_errors=True)
+    return model, metrics
 
 def main():
-    data = load_data('ml_data.csv')
+    parser = argparse.ArgumentParser(description="Train the leptospirosis risk model.")
+    parser.add_argument('file_path', nargs='?', default=os.path.join(MODEL_DIR, 'ml_data.csv'))
+    parser.add_argument('--stream', action='store_true', help="train out-of-core from CSV or Parquet chunks")
+    parser.add_argument('--chunksize', type=int, default=CHUNKSIZE)
+    parser.add_argument('--trees-per-chunk', type=int, default=TREES_PER_CHUNK)
+    parser.add_argument('--checkpoint', default=CHECKPOINT_DIR, help="checkpoint directory")
+    args = parser.parse_args()
+
+    if args.stream:
+        train_streaming(
+            args.file_path, chunksize=args.chunksize,
+            trees_per_chunk=args.trees_per_chunk, checkpoint_dir=args.checkpoint
+        )
+        return
+
+    data = load_data(args.file_path)
     if data is not None:
-        features = ['Temperature_Celsius', 'Dew_Point_Celsius', 'Relative_Humidity', 'TP']
-        target = 'Leptospirosis_Rate'
-        model, X, y = train_and_save_model(data, features, target)
-        evaluate_model(model, X, y)
+        digest = hash_training_rows(hashlib.sha256(), add_derived_features(data)).hexdigest()
+        data, features = build_features(data, LAGS, WINDOWS)
+        data = data.dropna(subset=features)
+        model, X, y = train_and_save_model(data, features, TARGET)
+        metrics = evaluate_model(model, X, y)
+        version = publish_model(
+            model, features, TARGET, None, metrics,
+            extra={
+                'lags': list(LAGS),
+                'windows': list(WINDOWS),
+                'training_rows': len(data),
+                'training_data_hash': digest,
+                'training_mode': 'in_memory'
+            }
+        )
+        print(f"Published model version {version} to the registry.")
 
 if __name__ == "__main__":
     main()
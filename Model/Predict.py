@@ -1,7 +1,14 @@
+import os
 import pandas as pd
 import numpy as np
 from sklearn.ensemble import RandomForestRegressor
 import joblib
+from Model import MODEL_DIR
+from Model.features import TARGET, build_features
+from Model.registry import current_version, load_version
+from Model.uncertainty import (
+    predict_with_intervals, sample_climate_scenarios, predict_scenarios_with_intervals
+)
 
 def load_data(file_path):
     try:
@@ -37,31 +44,38 @@ def identify_primary_factor(model, features):
     importances = model.feature_importances_
     return features[np.argmax(importances)]
 
-def predict_risk(data, model, features, historical_max, country_name, start_year, end_year):
+def predict_risk(data, model, features, historical_max, country_name, start_year, end_year, n_scenarios=0):
     country_data = data[data['Country Name'] == country_name]
     if country_data.empty:
         return []
 
-    predictions = []
-    latest_data = country_data.sort_values(by='Year').iloc[-1].copy()
+    years = np.arange(start_year, end_year + 1)
+    latest_data = country_data.sort_values(by='Year').iloc[-1][features].to_numpy(dtype=np.float64)
+    base = np.tile(latest_data, (len(years), 1))
 
-    for year in range(start_year, end_year + 1):
-        for feature in features:
-            latest_data[feature] *= np.random.uniform(0.98, 1.02)
+    # Without scenarios the latest observed climate is held fixed for every year
+    if n_scenarios > 0:
+        scenarios = sample_climate_scenarios(base, n_scenarios)
+        point, lower, upper = predict_scenarios_with_intervals(model, scenarios)
+    else:
+        point, lower, upper = predict_with_intervals(model, base)
+    floor = max(historical_max * 0.01, 0.01)
+    point = np.where(point == 0, floor, point)
 
-        prediction = model.predict(pd.DataFrame([latest_data[features].to_dict()]))[0]
-        if prediction == 0:
-            prediction = max(historical_max * 0.01, 0.01)
+    primary_factor = identify_primary_factor(model, features)
+    predictions = []
 
+    for year, prediction, low, high in zip(years, point, lower, upper):
         risk_percentage = calculate_risk_percentage(prediction, historical_max)
         risk_level, color_indicator = get_risk_level(risk_percentage)
-        primary_factor = identify_primary_factor(model, features)
         recommendation = get_recommendations(risk_level)
 
         predictions.append({
-            'Year': year,
+            'Year': int(year),
             'Country': country_name,
             'Prediction': prediction,
+            'Lower Bound': low,
+            'Upper Bound': high,
             'Risk Percentage': risk_percentage,
             'Risk Level': risk_level,
             'Primary Factor': primary_factor,
@@ -69,25 +83,35 @@ def predict_risk(data, model, features, historical_max, country_name, start_year
             'Color Indicator': color_indicator
         })
 
-        print(f"\n{year} | {country_name} | Pred: {prediction:.5f} | Risk: {risk_percentage:.1f}% | Level: {color_indicator} {risk_level}")
+        print(f"\n{year} | {country_name} | Pred: {prediction:.5f} [{low:.5f} - {high:.5f}] | Risk: {risk_percentage:.1f}% | Level: {color_indicator} {risk_level}")
 
     return predictions
 
 def main():
     print("\n--- Starting Leptospirosis Risk Prediction ---")
-    file_path = 'ml_data.csv'
+    file_path = os.path.join(MODEL_DIR, 'ml_data.csv')
     data = load_data(file_path)
     if data is None:
         print("Failed to load data.")
         return
 
-    model = joblib.load('trained_model.pkl')
-    historical_max = data['Leptospirosis_Rate'].max()
+    version = current_version()
+    if version is not None:
+        model, metadata = load_version(version)
+        data, features = build_features(data, metadata.get('lags', ()), metadata.get('windows', ()))
+        data = data.dropna(subset=features)
+        print(f"\nUsing model version {version}")
+    else:
+        model = joblib.load(os.path.join(MODEL_DIR, 'trained_model.pkl'))
+        data, features = build_features(data)
+    historical_max = data[TARGET].max()
     
     print(f"\nHistorical Max Rate: {historical_max:.5f}")
 
     country_input = input("\nEnter country name (or 'All' for all countries): ")
     end_year = int(input("Enter end year for predictions: "))
+    scenario_input = input("Enter number of climate scenarios to sample (default 0): ").strip()
+    n_scenarios = int(scenario_input) if scenario_input else 0
 
     all_predictions = []
 
@@ -95,16 +119,17 @@ def main():
         unique_countries = data['Country Name'].unique()
         print(f"\nAnalyzing risk for all countries from 2024 to {end_year}...")
         for country in unique_countries:
-            predictions = predict_risk(data, model, ['Temperature_Celsius', 'Dew_Point_Celsius', 'Relative_Humidity', 'TP'], historical_max, country, 2024, end_year)
+            predictions = predict_risk(data, model, features, historical_max, country, 2024, end_year, n_scenarios)
             all_predictions.extend(predictions)
     else:
-        predictions = predict_risk(data, model, ['Temperature_Celsius', 'Dew_Point_Celsius', 'Relative_Humidity', 'TP'], historical_max, country_input, 2024, end_year)
+        predictions = predict_risk(data, model, features, historical_max, country_input, 2024, end_year, n_scenarios)
         all_predictions.extend(predictions)
 
     if all_predictions:
         output_df = pd.DataFrame(all_predictions)
-        output_df.to_csv('leptospirosis_predictions.csv', index=False)
-        print(f"\nPredictions saved to 'leptospirosis_predictions.csv'.")
+        output_path = os.path.join(MODEL_DIR, 'leptospirosis_predictions.csv')
+        output_df.to_csv(output_path, index=False)
+        print(f"\nPredictions saved to '{output_path}'.")
 
 if __name__ == "__main__":
     main()
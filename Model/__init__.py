@@ -0,0 +1,3 @@
+import os
+
+MODEL_DIR = os.path.dirname(os.path.abspath(__file__))
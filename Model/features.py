@@ -0,0 +1,77 @@
+import numpy as np
+
+FEATURES = ['Temperature_Celsius', 'Dew_Point_Celsius', 'Relative_Humidity', 'TP']
+TARGET = 'Leptospirosis_Rate'
+GROUP_COLUMN = 'Country Name'
+ORDER_COLUMN = 'Year'
+
+# Magnus coefficients, same as making_ml_data.ipynb
+MAGNUS_A = 17.625
+MAGNUS_B = 243.04
+KELVIN_OFFSET = 273.15
+
+def kelvin_to_celsius(kelvin):
+    return np.subtract(np.asarray(kelvin, dtype=np.float64), KELVIN_OFFSET)
+
+def relative_humidity(temp_c, dew_c):
+    # 100 * exp(a*Td/(b+Td)) / exp(a*T/(b+T)), folded into a single exp
+    temp_c = np.asarray(temp_c, dtype=np.float64)
+    dew_c = np.asarray(dew_c, dtype=np.float64)
+    rh = dew_c / (MAGNUS_B + dew_c)
+    rh -= temp_c / (MAGNUS_B + temp_c)
+    rh *= MAGNUS_A
+    np.exp(rh, out=rh)
+    rh *= 100
+    return rh
+
+def add_derived_features(data):
+    # Recompute from the raw ERA5 columns when present. The arithmetic runs in
+    # float64 like the notebook that wrote ml_data.csv, and only the finished
+    # columns are cast to float32 (what the forest uses internally), so the
+    # model sees exactly the values it was trained on.
+    if 'T2M' in data.columns:
+        data['Temperature_Celsius'] = kelvin_to_celsius(data['T2M'].to_numpy())
+    if 'D2M' in data.columns:
+        data['Dew_Point_Celsius'] = kelvin_to_celsius(data['D2M'].to_numpy())
+    if 'Relative_Humidity' not in data.columns or {'T2M', 'D2M'} <= set(data.columns):
+        data['Relative_Humidity'] = relative_humidity(
+            data['Temperature_Celsius'].to_numpy(), data['Dew_Point_Celsius'].to_numpy()
+        )
+    for feature in FEATURES:
+        data[feature] = data[feature].astype(np.float32, copy=False)
+    return data
+
+def lag_feature_name(feature, lag):
+    return f"{feature}_lag{lag}"
+
+def rolling_feature_name(feature, window):
+    return f"{feature}_roll{window}"
+
+def feature_columns(lags=(), windows=()):
+    columns = list(FEATURES)
+    columns += [lag_feature_name(f, lag) for lag in lags for f in FEATURES]
+    columns += [rolling_feature_name(f, w) for w in windows for f in FEATURES]
+    return columns
+
+def add_history_features(data, lags=(), windows=(), group=GROUP_COLUMN, order=ORDER_COLUMN):
+    # Lagged values and trailing means of each climate feature within a country.
+    # The first rows of every country have no lag and come back as NaN.
+    if not lags and not windows:
+        return data
+    data = data.sort_values([group, order])
+    grouped = data.groupby(group, sort=False)[FEATURES]
+    for lag in lags:
+        shifted = grouped.shift(lag)
+        for feature in FEATURES:
+            data[lag_feature_name(feature, lag)] = shifted[feature].astype(np.float32)
+    for window in windows:
+        rolled = grouped.rolling(window, min_periods=1).mean().reset_index(level=0, drop=True)
+        for feature in FEATURES:
+            data[rolling_feature_name(feature, window)] = rolled[feature].astype(np.float32)
+    return data
+
+def build_features(data, lags=(), windows=()):
+    # Single entry point for training and inference so both derive the same columns
+    data = add_derived_features(data)
+    data = add_history_features(data, lags, windows)
+    return data, feature_columns(lags, windows)
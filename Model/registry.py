@@ -0,0 +1,201 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from datetime import datetime
+import joblib
+import pandas as pd
+from Model import MODEL_DIR
+
+REGISTRY_DIR = os.path.join(MODEL_DIR, 'registry')
+CURRENT_FILE = 'CURRENT'
+MODEL_FILE = 'model.pkl'
+METADATA_FILE = 'metadata.json'
+CACHE_SIZE = 128
+
+def update_data_hash(hasher, data):
+    # Hashing chunk by chunk gives the same digest as hashing the concatenated frame
+    hasher.update(pd.util.hash_pandas_object(data, index=False).to_numpy().tobytes())
+    return hasher
+
+def data_hash(data):
+    return update_data_hash(hashlib.sha256(), data).hexdigest()
+
+def list_versions(registry_dir=REGISTRY_DIR):
+    if not os.path.isdir(registry_dir):
+        return []
+    return sorted(
+        name for name in os.listdir(registry_dir)
+        if name.startswith('v') and os.path.isdir(os.path.join(registry_dir, name))
+    )
+
+def current_version(registry_dir=REGISTRY_DIR):
+    try:
+        with open(os.path.join(registry_dir, CURRENT_FILE)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+def _write_atomic(path, text):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+    with os.fdopen(fd, 'w') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+def publish_model(model, features, target, data, metrics, registry_dir=REGISTRY_DIR, extra=None):
+    # The version directory is filled under a temporary name and renamed into
+    # place, and CURRENT is swapped last, so readers never see a partial version.
+    # Model/Lepto.py hashes the input rows itself (file order, before history
+    # features), so it passes data=None and supplies training_rows/training_data_hash in extra.
+    os.makedirs(registry_dir, exist_ok=True)
+    versions = list_versions(registry_dir)
+    version = f"v{int(versions[-1][1:]) + 1 if versions else 1:04d}"
+
+    staging_dir = tempfile.mkdtemp(prefix='.staging-', dir=registry_dir)
+    joblib.dump(model, os.path.join(staging_dir, MODEL_FILE))
+    metadata = {
+        'version': version,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'features': list(features),
+        'target': target,
+        'metrics': metrics
+    }
+    if data is not None:
+        metadata['training_rows'] = len(data)
+        metadata['training_data_hash'] = data_hash(data[list(features) + [target]])
+    metadata.update(extra or {})
+    with open(os.path.join(staging_dir, METADATA_FILE), 'w') as f:
+        json.dump(metadata, f, indent=2)
+
+    os.rename(staging_dir, os.path.join(registry_dir, version))
+    _write_atomic(os.path.join(registry_dir, CURRENT_FILE), version)
+    return version
+
+def load_metadata(version, registry_dir=REGISTRY_DIR):
+    with open(os.path.join(registry_dir, version, METADATA_FILE)) as f:
+        return json.load(f)
+
+def load_version(version, registry_dir=REGISTRY_DIR):
+    metadata = load_metadata(version, registry_dir)
+    model = joblib.load(os.path.join(registry_dir, version, MODEL_FILE))
+    return model, metadata
+
+class ResultCache:
+    # Small thread-safe LRU; the oldest entry is evicted once max_entries is reached
+    def __init__(self, max_entries=CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+class LoadedModel:
+    def __init__(self, version, model, metadata):
+        self.version = version
+        self.model = model
+        self.metadata = metadata
+        self.features = metadata['features']
+        # Results computed with this model only; dropped together with it on swap
+        self.cache = ResultCache()
+
+class ModelWatcher:
+    """Serve the current registry version and hot-swap to newly published ones.
+
+    New versions are loaded on a background thread; requests keep using the
+    previous model until the replacement is fully loaded, then the reference
+    is swapped in a single assignment. When supported_features is given,
+    versions that need any other input column are refused and the current
+    model stays in place. At startup an unsupported CURRENT falls back to the
+    newest supported version, then to fallback_loader; if nothing can be
+    loaded, active is None and the error is printed.
+    """
+
+    def __init__(self, registry_dir=REGISTRY_DIR, poll_interval=5.0, fallback_loader=None,
+                 supported_features=None):
+        self.registry_dir = registry_dir
+        self.poll_interval = poll_interval
+        self.supported_features = supported_features
+        self._stop = threading.Event()
+        self._thread = None
+        self._active = None
+        self._rejected = set()
+        try:
+            self.refresh()
+            if self._active is None:
+                self._load_newest_supported()
+        except Exception as e:
+            print(f"Error: failed to load model version: {e}")
+        if self._active is None and fallback_loader is not None:
+            try:
+                self._active = fallback_loader()
+            except Exception as e:
+                print(f"Error: no usable model in the registry and the fallback model failed to load: {e}")
+
+    @property
+    def active(self):
+        return self._active
+
+    def is_supported(self, metadata):
+        if self.supported_features is None:
+            return True
+        return set(metadata['features']) <= set(self.supported_features)
+
+    def _load_newest_supported(self):
+        for version in reversed(list_versions(self.registry_dir)):
+            if version in self._rejected:
+                continue
+            if self.is_supported(load_metadata(version, self.registry_dir)):
+                self._active = LoadedModel(version, *load_version(version, self.registry_dir))
+                print(f"Serving model version {version}")
+                return True
+        return False
+
+    def refresh(self):
+        version = current_version(self.registry_dir)
+        active = self._active
+        if version is None or version in self._rejected:
+            return False
+        if active is not None and active.version == version:
+            return False
+        metadata = load_metadata(version, self.registry_dir)
+        if not self.is_supported(metadata):
+            self._rejected.add(version)
+            missing = sorted(set(metadata['features']) - set(self.supported_features))
+            print(f"Error: model version {version} needs unsupported features {missing}; keeping the current model")
+            return False
+        self._active = LoadedModel(version, *load_version(version, self.registry_dir))
+        print(f"Switched to model version {version}")
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Error: failed to load model version: {e}")
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
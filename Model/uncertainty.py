@@ -0,0 +1,31 @@
+import numpy as np
+
+DEFAULT_INTERVAL = (0.05, 0.95)
+
+def per_tree_predictions(model, X):
+    # Trees are fitted on float32 arrays, so convert once and reuse for every tree
+    X = np.asarray(X, dtype=np.float32)
+    return np.stack([tree.predict(X) for tree in model.estimators_])
+
+def summarize_predictions(samples, interval=DEFAULT_INTERVAL):
+    lower, upper = np.quantile(samples, interval, axis=0)
+    return samples.mean(axis=0), lower, upper
+
+def predict_with_intervals(model, X, interval=DEFAULT_INTERVAL):
+    return summarize_predictions(per_tree_predictions(model, X), interval)
+
+def sample_climate_scenarios(base, n_scenarios, drift=0.02, rng=None):
+    # base is (n_steps, n_features); each scenario applies a random +/- drift
+    # multiplier per feature and step, compounding along the step axis.
+    rng = np.random.default_rng() if rng is None else rng
+    base = np.asarray(base, dtype=np.float64)
+    multipliers = rng.uniform(1 - drift, 1 + drift, size=(n_scenarios,) + base.shape)
+    return base * np.cumprod(multipliers, axis=1)
+
+def predict_scenarios_with_intervals(model, scenarios, interval=DEFAULT_INTERVAL):
+    # All scenarios go through the forest as one batch; tree and scenario
+    # samples are then pooled before taking quantiles per step.
+    n_scenarios, n_steps, n_features = scenarios.shape
+    tree_preds = per_tree_predictions(model, scenarios.reshape(-1, n_features))
+    samples = tree_preds.reshape(-1, n_steps)
+    return summarize_predictions(samples, interval)
@@ -7,6 +7,11 @@ from sklearn.linear_model import LinearRegression
 import calendar
 import plotly.express as px
 from datetime import datetime
+from Model.features import FEATURES, build_features
+from Model.registry import LoadedModel, ModelWatcher, data_hash
+from Model.uncertainty import (
+    predict_with_intervals, sample_climate_scenarios, predict_scenarios_with_intervals
+)
 
 # Regional threshold definitions for European regions
 REGIONAL_THRESHOLDS = {
@@ -60,11 +65,17 @@ COUNTRY_CHARACTERISTICS = {
     }
 }
 
-# Load the trained model
-model = joblib.load('trained_random_forest_model.pkl')
+# Serve the current registry version, hot-swapping when a retrain is published.
+# Without a registry the original pickle is used. predict_future_factors only
+# projects the base climate columns, so versions trained with lag or rolling
+# features are refused and the running model is kept.
+def load_legacy_model():
+    return LoadedModel('legacy', joblib.load('trained_random_forest_model.pkl'), {'features': FEATURES})
+
+model_watcher = ModelWatcher(fallback_loader=load_legacy_model, supported_features=FEATURES).start()
 
 # Define features used in the model
-features = ['Temperature_Celsius', 'Dew_Point_Celsius', 'Relative_Humidity', 'TP']
+features = FEATURES
 
 # Helper functions
 def calculate_risk_percentage(prediction, historical_max):
@@ -180,19 +191,47 @@ def index():
             # Get user inputs
             target_year = int(request.form["year"])
             country_name = request.form["country"]
+            n_scenarios = int(request.form.get("scenarios") or 0)
+            # Pin one model version for the whole request
+            active = model_watcher.active
+            if active is None:
+                return render_template("index.html", error="No trained model is available. Train one with python -m Model.Lepto.")
+            model = active.model
             historical_max = 100  # Replace with actual historical maximum
             
             # Simulate future environmental factors
             file_path = 'E:\\LeptoVS\\ml_final_data.csv'
             data = pd.read_csv(file_path)
-            data = data.dropna()  # Drop rows with missing values
+            data, _ = build_features(
+                data.dropna(),  # Drop rows with missing values
+                active.metadata.get('lags', ()),
+                active.metadata.get('windows', ())
+            )
             if data.empty:
                 return render_template("index.html", error="Failed to load or process the dataset.")
             
             future_factors = predict_future_factors(data, features, target_year)
+            model_features = active.features
+            
+            # Deterministic responses are cached per model version, keyed on the
+            # actual model inputs so a changed dataset is never served stale
+            cache_key = None
+            if n_scenarios == 0:
+                cache_key = (target_year, country_name, data_hash(future_factors[model_features]))
+                cached = active.cache.get(cache_key)
+                if cached is not None:
+                    return render_template("index.html", **cached)
             
-            # Predict leptospirosis risk
-            future_factors['Predicted_Leptospirosis_Rate'] = model.predict(future_factors[features])
+            # Predict leptospirosis risk with per-tree intervals, optionally
+            # pooling Monte Carlo samples of the projected climate inputs
+            if n_scenarios > 0:
+                scenarios = sample_climate_scenarios(future_factors[model_features].values, n_scenarios)
+                point, lower, upper = predict_scenarios_with_intervals(model, scenarios)
+            else:
+                point, lower, upper = predict_with_intervals(model, future_factors[model_features])
+            future_factors['Predicted_Leptospirosis_Rate'] = point
+            future_factors['Lower_Rate'] = lower
+            future_factors['Upper_Rate'] = upper
             future_factors['Risk_Percentage'] = future_factors['Predicted_Leptospirosis_Rate'].apply(
                 lambda x: calculate_risk_percentage(x, historical_max)
             )
@@ -204,13 +243,15 @@ def index():
                 prediction = row['Predicted_Leptospirosis_Rate']
                 risk_percentage = row['Risk_Percentage']
                 risk_level = row['Risk_Level']
-                primary_factor = identify_primary_factor(model, features)
+                primary_factor = identify_primary_factor(model, model_features)
                 general_recommendations = get_prevention_recommendations(risk_level, primary_factor)
                 
                 recommendations.append({
                     'Year': row['Year'],
                     'Month': row['Month_Name'],  # Use month name instead of number
                     'Predicted_Rate': prediction,
+                    'Lower_Rate': row['Lower_Rate'],
+                    'Upper_Rate': row['Upper_Rate'],
                     'Risk_Percentage': risk_percentage,
                     'Risk_Level': risk_level,
                     'Primary_Factor': primary_factor,
@@ -256,12 +297,16 @@ def index():
             )
             pie_chart_html = fig.to_html(full_html=False)
             
-            return render_template(
-                "index.html",
+            context = dict(
                 recommendations=recommendations,
                 country_specific_recommendations=country_specific_recommendations,  # Pass country-specific recommendations separately
-                pie_chart_html=pie_chart_html
+                pie_chart_html=pie_chart_html,
+                model_version=active.version,
+                scenarios=n_scenarios
             )
+            if cache_key is not None:
+                active.cache.put(cache_key, context)
+            return render_template("index.html", **context)
         except Exception as e:
             return render_template("index.html", error=f"An error occurred: {str(e)}")
     
@@ -0,0 +1,51 @@
+import pandas as pd
+
+from Model.Export import COLUMNS, connect_sqlite, export_predictions, load_predictions
+
+
+def write_predictions(path, rows):
+    pd.DataFrame(rows, columns=list(COLUMNS)).to_csv(path, index=False)
+
+
+def test_sqlite_upsert_round_trip(tmp_path):
+    csv_path = tmp_path / "predictions.csv"
+    conn = connect_sqlite(str(tmp_path / "predictions.db"))
+
+    write_predictions(csv_path, [
+        (2024, 'Austria', 1.5, 20.0, 'Low', 'TP', 'Low risk, maintain hygiene.'),
+        (2024, 'Italy', 2.5, 30.0, 'Moderate', 'TP', 'Stay cautious!'),
+    ])
+    export_predictions(conn, load_predictions(csv_path), 'sqlite')
+
+    write_predictions(csv_path, [
+        (2024, 'Austria', 4.0, 80.0, 'Very High', 'TP', 'Immediate intervention needed!'),
+        (2024, 'Italy', 2.5, 30.0, 'Moderate', 'TP', 'Stay cautious!'),
+    ])
+    export_predictions(conn, load_predictions(csv_path), 'sqlite')
+
+    rows = conn.execute(
+        "SELECT country, predicted_rate, risk_level FROM riskanalysis ORDER BY year, country"
+    ).fetchall()
+    conn.close()
+    assert rows == [('Austria', 4.0, 'Very High'), ('Italy', 2.5, 'Moderate')]
+
+
+def test_existing_duplicate_keys_abort_export(tmp_path, capsys):
+    conn = connect_sqlite(str(tmp_path / "predictions.db"))
+    conn.execute("CREATE TABLE riskanalysis (year integer, country varchar(100), predicted_rate numeric, "
+                 "risk_percentage numeric, risk_level varchar(50), primary_factor varchar(100), recommendations text)")
+    conn.executemany("INSERT INTO riskanalysis (year, country) VALUES (?, ?)", [(2024, 'Austria')] * 2)
+    conn.commit()
+
+    csv_path = tmp_path / "predictions.csv"
+    write_predictions(csv_path, [(2024, 'Austria', 1.5, 20.0, 'Low', 'TP', 'Low risk, maintain hygiene.')])
+
+    assert export_predictions(conn, load_predictions(csv_path), 'sqlite') is None
+    assert "(2024, 'Austria')" in capsys.readouterr().out
+    conn.close()
+
+
+def test_missing_columns(tmp_path):
+    csv_path = tmp_path / "predictions.csv"
+    pd.DataFrame({'Year': [2024], 'Country': ['Austria']}).to_csv(csv_path, index=False)
+    assert load_predictions(csv_path) is None
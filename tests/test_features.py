@@ -0,0 +1,30 @@
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from Model import MODEL_DIR
+from Model.features import FEATURES, build_features
+
+
+def load_ml_data():
+    return pd.read_csv(os.path.join(MODEL_DIR, 'ml_data.csv')).dropna()
+
+
+def test_derived_columns_match_stored_csv():
+    raw = load_ml_data()
+    data, features = build_features(raw.copy())
+
+    assert features == FEATURES
+    for feature in FEATURES:
+        assert data[feature].dtype == np.float32
+        np.testing.assert_array_equal(data[feature].to_numpy(), raw[feature].to_numpy(dtype=np.float32))
+
+
+def test_shipped_model_predictions_unchanged():
+    raw = load_ml_data()
+    data, features = build_features(raw.copy())
+    model = joblib.load(os.path.join(MODEL_DIR, 'trained_model.pkl'))
+
+    np.testing.assert_array_equal(model.predict(data[features]), model.predict(raw[FEATURES]))
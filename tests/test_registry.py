@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+
+from Model.features import FEATURES, TARGET, feature_columns
+from Model.registry import LoadedModel, ModelWatcher, current_version, publish_model
+
+
+def publish(registry_dir, features):
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame(rng.random((20, len(features) + 1)), columns=features + [TARGET])
+    model = RandomForestRegressor(n_estimators=2, random_state=0).fit(data[features], data[TARGET])
+    return publish_model(model, features, TARGET, data, {}, registry_dir=str(registry_dir))
+
+
+def test_unsupported_current_falls_back_to_newest_supported(tmp_path):
+    publish(tmp_path, FEATURES)
+    supported = publish(tmp_path, FEATURES)
+    lagged = publish(tmp_path, feature_columns(lags=(1,)))
+    assert current_version(str(tmp_path)) == lagged
+
+    watcher = ModelWatcher(registry_dir=str(tmp_path), supported_features=FEATURES)
+    assert watcher.active.version == supported
+
+
+def test_refresh_keeps_current_model_for_unsupported_version(tmp_path):
+    supported = publish(tmp_path, FEATURES)
+    watcher = ModelWatcher(registry_dir=str(tmp_path), supported_features=FEATURES)
+
+    publish(tmp_path, feature_columns(lags=(1,)))
+    assert watcher.refresh() is False
+    assert watcher.active.version == supported
+
+
+def test_missing_fallback_model_does_not_raise(tmp_path):
+    def load_missing():
+        raise FileNotFoundError('trained_random_forest_model.pkl')
+
+    watcher = ModelWatcher(registry_dir=str(tmp_path / 'empty'), fallback_loader=load_missing)
+    assert watcher.active is None
+
+
+def test_fallback_used_without_registry(tmp_path):
+    fallback = LoadedModel('legacy', None, {'features': FEATURES})
+    watcher = ModelWatcher(registry_dir=str(tmp_path / 'empty'), fallback_loader=lambda: fallback)
+    assert watcher.active is fallback
@@ -0,0 +1,39 @@
+import hashlib
+import os
+
+import pandas as pd
+import pytest
+
+from Model import MODEL_DIR
+from Model.features import add_derived_features, build_features
+from Model.Lepto import hash_training_rows, iter_chunks, load_data, prepare_chunk
+
+ML_DATA = os.path.join(MODEL_DIR, 'ml_data.csv')
+
+
+def stream(lags, windows, chunksize):
+    hasher = hashlib.sha256()
+    history = None
+    parts = []
+    for chunk in iter_chunks(ML_DATA, chunksize):
+        data, features, history = prepare_chunk(chunk, history, lags, windows, hasher)
+        parts.append(data)
+    return pd.concat(parts), features, hasher.hexdigest()
+
+
+@pytest.mark.parametrize('lags, windows', [((), ()), ((), (1,)), ((1,), (3,))])
+def test_streamed_hash_and_features_match_in_memory(lags, windows):
+    streamed, features, streamed_digest = stream(lags, windows, chunksize=100)
+
+    data = load_data(ML_DATA)
+    digest = hash_training_rows(hashlib.sha256(), add_derived_features(data)).hexdigest()
+    data, in_memory_features = build_features(data, lags, windows)
+    data = data.dropna(subset=in_memory_features)
+
+    assert streamed_digest == digest
+    assert features == in_memory_features
+    key = ['Country Name', 'Year']
+    pd.testing.assert_frame_equal(
+        streamed.sort_values(key)[features].reset_index(drop=True),
+        data.sort_values(key)[features].reset_index(drop=True)
+    )